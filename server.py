@@ -1,23 +1,114 @@
 from mcp.server.fastmcp import FastMCP, Context
+from asyncio_connection_pool import ConnectionPool, ConnectionStrategy
 
+import asyncio
 import logging
-from dataclasses import dataclass
+import threading
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Any, List
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Any, Iterable, Optional, Tuple
 import carla
+from carla import WorldSnapshot
+
+# carla.command is not an importable module, so bind the command class once.
+DestroyActor = carla.command.DestroyActor
 
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 logger = logging.getLogger("CarlaMCPServer")
 
-@dataclass
+# Map name and vehicle blueprint ids of the loaded world, shared by all connections.
+_world_cache: Dict[str, Any] = {}
+# Bumped on every world reload so connections cached against an older world are retired.
+_world_generation = 0
+
+class ActorRegistry:
+    """Actors spawned through the server, shared by all Carla connections."""
+    __slots__ = (
+        "_vehicles", "_sensors", "_actors",
+        "_vehicle_ids", "_sensor_ids", "_actor_ids", "_lock",
+    )
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._vehicles = {}
+        self._sensors = {}
+        self._actors = {}
+        self._vehicle_ids = ()
+        self._sensor_ids = ()
+        self._actor_ids = ()
+        self._lock = threading.Lock()
+
+    def add_vehicle(self, vehicle: carla.Actor) -> None:
+        """Track a spawned vehicle."""
+        with self._lock:
+            self._vehicles[vehicle.id] = vehicle
+            self._vehicle_ids = tuple(self._vehicles)
+    def add_sensor(self, sensor: carla.Actor) -> None:
+        """Track a spawned sensor."""
+        with self._lock:
+            self._sensors[sensor.id] = sensor
+            self._sensor_ids = tuple(self._sensors)
+    def add_actor(self, actor: carla.Actor) -> None:
+        """Track a spawned actor."""
+        with self._lock:
+            self._actors[actor.id] = actor
+            self._actor_ids = tuple(self._actors)
+    def snapshot(self) -> Dict[int, carla.Actor]:
+        """Get all tracked vehicles, sensors and actors keyed by actor id."""
+        with self._lock:
+            return {**self._vehicles, **self._sensors, **self._actors}
+    def forget(self, ids: Optional[Iterable[int]] = None) -> None:
+        """Stop tracking the given actor ids, or every actor if none are given."""
+        with self._lock:
+            if ids is None:
+                self._vehicles.clear()
+                self._sensors.clear()
+                self._actors.clear()
+            else:
+                for actor_id in ids:
+                    self._vehicles.pop(actor_id, None)
+                    self._sensors.pop(actor_id, None)
+                    self._actors.pop(actor_id, None)
+            self._vehicle_ids = tuple(self._vehicles)
+            self._sensor_ids = tuple(self._sensors)
+            self._actor_ids = tuple(self._actors)
+    def get_vehicles(self) -> Tuple[int, ...]:
+        """Get the list of vehicles in the world."""
+        if self._vehicle_ids:
+            return self._vehicle_ids
+        else:
+            logger.warning("No vehicles loaded")
+            return ()
+    def get_sensors(self) -> Tuple[int, ...]:
+        """Get the list of sensors in the world."""
+        if self._sensor_ids:
+            return self._sensor_ids
+        else:
+            logger.warning("No sensors loaded")
+            return ()
+    def get_actors(self) -> Tuple[int, ...]:
+        """Get the list of actors in the world."""
+        if self._actor_ids:
+            return self._actor_ids
+        else:
+            logger.warning("No actors loaded")
+            return ()
+
+_actor_registry = ActorRegistry()
+
 class CarlaConnection:
     """Class representing a connection to the Carla server."""
+    __slots__ = (
+        "host", "port", "client", "world", "map", "blueprints", "registry",
+        "_map_name", "_vehicle_bp_ids", "_generation", "_stale",
+    )
     host: str
     port: int
 
-    def __init__(self, host: str = "localhost", port: int = 2000):
+    def __init__(self, host: str = "localhost", port: int = 2000, registry: Optional[ActorRegistry] = None):
         """Initialize the CarlaConnection with host and port."""
         self.host = host
         self.port = port
@@ -25,7 +116,11 @@ class CarlaConnection:
         self.world = None
         self.map = None
         self.blueprints = None
-        self.vehicles = []
+        self.registry = registry if registry is not None else _actor_registry
+        self._map_name = None
+        self._vehicle_bp_ids = ()
+        self._generation = _world_generation
+        self._stale = False
 
     def connect(self) -> None:
         """Connect to the Carla server."""
@@ -34,93 +129,142 @@ class CarlaConnection:
         try:
             self.client = carla.Client(self.host, self.port)
             self.client.set_timeout(10.0)
-            logger.info("Connected to Carla server")
+            self.world = self.client.get_world()
+            self._cache_world()
         except Exception as e:
+            self.client = None
+            self.world = None
+            _world_cache.clear()
             logger.error(f"Failed to connect to Carla server: {e}")
             raise
-        self.world = self.client.get_world()
-        self.map = self.world.get_map()
-        self.blueprints = self.world.get_blueprint_library()
-        self.vehicles = []
-        self.sensors = []
-        self.actors = []
-        self.vehicles = []
+        self._stale = False
+        logger.info("Connected to Carla server")
 
     def disconnect(self) -> None:
         """Disconnect from the Carla server."""
         logger.info("Disconnecting from Carla server")
         try:
             if self.client:
-                self.client.apply_batch_sync([carla.command.DestroyActor(x) for x in self.vehicles])
-                self.client.apply_batch_sync([carla.command.DestroyActor(x) for x in self.sensors])
-                self.client.apply_batch_sync([carla.command.DestroyActor(x) for x in self.actors])
+                self._destroy(self.registry.snapshot())
                 self.client = None
+                _world_cache.clear()
                 logger.info("Disconnected from Carla server")
             else:
                 logger.warning("No active connection to disconnect")
         except Exception as e:
+            if isinstance(e, RuntimeError):
+                self._mark_stale()
             logger.error(f"Failed to disconnect from Carla server: {e}")
             raise
        
     def disconnect_all(self) -> None:
-        """Disconnect all actors."""
+        """Destroy all tracked actors, keeping the connection open."""
         logger.info("Disconnecting all actors")
         try:
             if self.client:
-                self.client.apply_batch_sync([carla.command.DestroyActor(x) for x in self.vehicles])
-                self.client.apply_batch_sync([carla.command.DestroyActor(x) for x in self.sensors])
-                self.client.apply_batch_sync([carla.command.DestroyActor(x) for x in self.actors])
+                self._destroy(self.registry.snapshot(), sync=False)
                 logger.info("Disconnected all actors")
             else:
                 logger.warning("No active connection to disconnect")
         except Exception as e:
+            if isinstance(e, RuntimeError):
+                self._mark_stale()
             logger.error(f"Failed to disconnect all actors: {e}")
             raise
-        self.vehicles = []
-        self.sensors = []
-        self.actors = []
-        self.vehicles = []
+
+    def _destroy(self, tracked: Dict[int, carla.Actor], sync: bool = True) -> None:
+        """Destroy and stop tracking the given actors in one batch.
+
+        With sync=False the batch is not acknowledged; a single world tick is
+        awaited instead. This assumes the server runs in asynchronous mode, as
+        a synchronous-mode server only ticks when a client calls world.tick().
+        """
+        destroy = DestroyActor
+        commands = [destroy(x) for x in tracked.values()]
+        if not commands:
+            return
+        if sync:
+            self.client.apply_batch_sync(commands)
+            self.registry.forget(tracked)
+            return
+        self.client.apply_batch(commands)
+        self.registry.forget(tracked)
+        try:
+            self.world.wait_for_tick()
+        except RuntimeError as e:
+            logger.warning(f"No world tick after destroying actors: {e}")
+
+    def _mark_stale(self) -> None:
+        """Flag the connection for reconnection and drop the shared world cache."""
+        self._stale = True
+        _world_cache.clear()
+
+    def close(self) -> None:
+        """Drop the client without destroying the tracked actors."""
         self.client = None
         self.world = None
-        self.map = None
-        self.blueprints = None
-    
+
+    def _cache_world(self) -> None:
+        """Cache the map and blueprint data, which only change on world reload."""
+        self._generation = _world_generation
+        self.map = self.world.get_map()
+        self.blueprints = self.world.get_blueprint_library()
+        self._map_name = self.map.name
+        self._vehicle_bp_ids = tuple(bp.id for bp in self.blueprints.filter("vehicle.*"))
+        _world_cache.update(map_name=self._map_name, vehicle_bp_ids=self._vehicle_bp_ids)
+
+    def reload_world(self) -> None:
+        """Reload the current world and refresh the cached world data."""
+        global _world_generation
+        logger.info("Reloading Carla world")
+        _world_generation += 1
+        try:
+            self.world = self.client.reload_world()
+            self._cache_world()
+        except Exception as e:
+            self._mark_stale()
+            logger.error(f"Failed to reload Carla world: {e}")
+            raise
+        self.registry.forget()
+
+    def _ensure_alive(self) -> None:
+        """Reconnect only if there is no client or a previous RPC has failed."""
+        if self.client is None or self._stale:
+            logger.info("Carla connection is stale, reconnecting")
+            self.connect()
+
     def get_map(self) -> str:
         """Get the current map name."""
-        if self.map:
-            return self.map.name
+        if self._map_name:
+            return self._map_name
         else:
             logger.warning("No map loaded")
             return None
-        return self.map.name
-    def get_blueprints(self) -> List[str]:
+    def get_blueprints(self) -> Tuple[str, ...]:
         """Get the list of available blueprints."""
-        if self.blueprints:
-            return [bp.id for bp in self.blueprints.filter("vehicle.*")]
+        if self.blueprints is not None:
+            return self._vehicle_bp_ids
         else:
             logger.warning("No blueprints loaded")
-            return []
-    def get_vehicles(self) -> List[str]:
+            return ()
+    def add_vehicle(self, vehicle: carla.Actor) -> None:
+        """Track a spawned vehicle."""
+        self.registry.add_vehicle(vehicle)
+    def add_sensor(self, sensor: carla.Actor) -> None:
+        """Track a spawned sensor."""
+        self.registry.add_sensor(sensor)
+    def add_actor(self, actor: carla.Actor) -> None:
+        """Track a spawned actor."""
+        self.registry.add_actor(actor)
+    def get_vehicles(self) -> Tuple[int, ...]:
         """Get the list of vehicles in the world."""
-        if self.vehicles:
-            return [vehicle.id for vehicle in self.vehicles]
-        else:
-            logger.warning("No vehicles loaded")
-            return []
-    def get_sensors(self) -> List[str]:
+        return self.registry.get_vehicles()
+    def get_sensors(self) -> Tuple[int, ...]:
         """Get the list of sensors in the world."""
-        if self.sensors:
-            return [sensor.id for sensor in self.sensors]
-        else:
-            logger.warning("No sensors loaded")
-            return []
-    def get_actors(self) -> List[str]:
+        return self.registry.get_sensors()
+    def get_actors(self) -> Tuple[int, ...]:
         """Get the list of actors in the world."""
-        if self.actors:
-            return [actor.id for actor in self.actors]
-        else:
-            logger.warning("No actors loaded")
-            return []
+        return self.registry.get_actors()
     def send_command(self, command: str) -> None:
         """Send a command to the Carla server."""
         logger.info(f"Sending command to Carla server: {command}")
@@ -128,9 +272,11 @@ class CarlaConnection:
             self.client.apply_batch_sync([carla.command.ExecuteCommand(command)])
             logger.info("Command sent successfully")
         except Exception as e:
+            if isinstance(e, RuntimeError):
+                self._mark_stale()
             logger.error(f"Failed to send command to Carla server: {e}")
             raise
-    def get_world_snapshot(self) -> carla.WorldSnapshot:
+    def get_world_snapshot(self) -> WorldSnapshot:
         """Get the current world snapshot."""
         if self.world:
             return self.world.get_snapshot()
@@ -139,28 +285,100 @@ class CarlaConnection:
             return None
     def get_map_name(self) -> str:
         """Get the current map name."""
-        if self.map:
-            return self.map.name
+        if self._map_name:
+            return self._map_name
         else:
             logger.warning("No map loaded")
             return None
    
+_connect_task: ContextVar[Optional[asyncio.Task]] = ContextVar("carla_connect_task", default=None)
+
+class CarlaStrategy(ConnectionStrategy[CarlaConnection]):
+    """Connection strategy creating pooled connections to the Carla server."""
+
+    def __init__(self):
+        """Initialize the strategy; the eager startup connection is not yet adopted."""
+        self._adopted = False
+
+    async def make_connection(self) -> CarlaConnection:
+        """Open a new connection without blocking the event loop."""
+        task = _connect_task.get()
+        if task is not None and not self._adopted:
+            self._adopted = True
+            try:
+                conn = await asyncio.shield(task)
+                logger.info("Using connection to Carla opened at startup")
+                return conn
+            except Exception as e:
+                logger.warning(f"Startup connection to Carla unavailable: {e}")
+        conn = CarlaConnection()
+        await asyncio.to_thread(conn.connect)
+        logger.info("Created new pooled connection to Carla")
+        return conn
+
+    def connection_is_closed(self, conn: CarlaConnection) -> bool:
+        """Check whether the connection has been torn down or predates a world reload."""
+        return conn.client is None or conn._stale or conn._generation != _world_generation
+
+    async def close_connection(self, conn: CarlaConnection) -> None:
+        """Close a connection evicted from the pool; tracked actors are kept."""
+        conn.close()
+
+
+_carla_pool = None
+
+def get_carla_pool() -> ConnectionPool[CarlaConnection]:
+    """Get the pool of connections to the Carla server."""
+    global _carla_pool
+    if _carla_pool is None:
+        _carla_pool = ConnectionPool(strategy=CarlaStrategy(), max_size=8, burst_limit=16)
+    return _carla_pool
+
+
+def _log_connect_result(task: asyncio.Task) -> None:
+    """Report the outcome of the connection opened at startup."""
+    if task.cancelled():
+        return
+    e = task.exception()
+    if e is None:
+        logger.info("Sucessfully connected to Carla server")
+    else:
+        logger.error(f"Failed to connect to Carla server: {e}")
+
+
 @asynccontextmanager
 async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     """Lifespan context manager for the FastMCP server."""
     try:
         logger.info("Starting FastMCP server")
-        try:
-            carla = get_carla_connection()
-            logger.info("Sucessfully connected to Carla server")
-        except Exception as e:
-            logger.error(f"Failed to connect to Carla server: {e}")
-        yield {}
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=16))
+        task = asyncio.create_task(asyncio.to_thread(get_carla_connection))
+        task.add_done_callback(_log_connect_result)
+        _connect_task.set(task)
+        yield {"connect_task": task}
     finally:
-            global _carla_connection
-            if _carla_connection:
-                logger.info("Disconnecting from Carla on shutdown")
-                _carla_connection.disconnect()
+            pool = get_carla_pool()
+            strategy = pool.strategy
+            # Only idle connections are closed; checked-out ones may be mid-call in a worker thread.
+            conns = []
+            while not pool.available.empty():
+                conns.append(pool.available.get_nowait())
+            if _carla_connection and not strategy._adopted:
+                conns.append(_carla_connection)
+            if _actor_registry.snapshot():
+                logger.info("Destroying tracked actors on shutdown")
+                try:
+                    live = next((conn for conn in conns if conn.client and not conn._stale), None)
+                    if live is None:
+                        live = CarlaConnection()
+                        await asyncio.to_thread(live.connect)
+                        conns.append(live)
+                    await asyncio.to_thread(live.disconnect)
+                except Exception as e:
+                    logger.error(f"Failed to destroy tracked actors on shutdown: {e}")
+            for conn in conns:
+                await strategy.close_connection(conn)
+            _world_cache.clear()
             logger.info("CarlaMCP server shut down")
 
 
@@ -177,29 +395,46 @@ def get_carla_connection():
     global _carla_connection
     if _carla_connection is None:
         try:
-            _carla_connection = CarlaConnection()
-            _carla_connection.connect()
+            conn = CarlaConnection()
+            conn.connect()
+            _carla_connection = conn
             logger.info("Created new persistent connection to Carla")
         except Exception as e:
             logger.error(f"Failed to create connection to Carla: {e}")
             raise
     else:
         try:
-            _carla_connection.connect()
-            logger.info("Reconnected to Carla")
+            _carla_connection._ensure_alive()
         except Exception as e:
             logger.error(f"Failed to reconnect to Carla: {e}")
             raise
     return _carla_connection
 
 
+_inflight: Dict[str, asyncio.Future] = {}
+
+async def _pooled_call(method: str) -> Any:
+    """Run a CarlaConnection method on a pooled connection in a worker thread."""
+    async with get_carla_pool().get_connection() as carla_conn:
+        return await asyncio.to_thread(getattr(carla_conn, method))
+
+async def _coalesced_call(method: str) -> Any:
+    """Share a single in-flight Carla call between concurrent identical requests."""
+    fut = _inflight.get(method)
+    if fut is None:
+        fut = asyncio.ensure_future(_pooled_call(method))
+        _inflight[method] = fut
+        fut.add_done_callback(lambda _: _inflight.pop(method, None))
+    return await asyncio.shield(fut)
+
+
 @mcp.tool()
-def destroy_all_actors(ctx: Context) -> bool:
+async def destroy_all_actors(ctx: Context) -> bool:
     """Destroy all actors in the Carla world."""
     logger.info("Destroying all actors")
     try:
-        carla = get_carla_connection()
-        carla.disconnect_all()
+        async with get_carla_pool().get_connection() as carla_conn:
+            await asyncio.to_thread(carla_conn.disconnect_all)
         logger.info("All actors destroyed")
     except Exception as e:
         logger.error(f"Failed to destroy all actors: {e}")
@@ -207,12 +442,13 @@ def destroy_all_actors(ctx: Context) -> bool:
     return True
 
 @mcp.tool()
-def get_map_name(ctx: Context) -> str:
+async def get_map_name(ctx: Context) -> str:
     """Get the name of the current map."""
     logger.info("Getting map name")
     try:
-        carla = get_carla_connection()
-        map_name = carla.get_map_name()
+        map_name = _world_cache.get("map_name")
+        if map_name is None:
+            map_name = await _coalesced_call("get_map_name")
         logger.info(f"Map name: {map_name}")
     except Exception as e:
         logger.error(f"Failed to get map name: {e}")
@@ -220,13 +456,16 @@ def get_map_name(ctx: Context) -> str:
     return map_name
 
 @mcp.tool()
-def get_blueprints() -> List[str]:
+async def get_blueprints() -> Tuple[str, ...]:
     """Get the list of available blueprints."""
     logger.info("Getting blueprints")
     try:
-        carla = get_carla_connection()
-        blueprints = carla.get_blueprints()
-        logger.info(f"Blueprints: {blueprints}")
+        blueprints = _world_cache.get("vehicle_bp_ids")
+        if blueprints is None:
+            blueprints = await _coalesced_call("get_blueprints")
+        logger.info("Got %d blueprints", len(blueprints))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Blueprints: %s", blueprints)
     except Exception as e:
         logger.error(f"Failed to get blueprints: {e}")
         raise